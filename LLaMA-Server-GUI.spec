@@ -1,39 +1,98 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+import sys
+
+# Settings passed in by build_exe.py (run it rather than this spec directly)
+bundle = os.environ.get('LLAMA_GUI_BUNDLE', 'onedir')
+optimize = int(os.environ.get('LLAMA_GUI_OPTIMIZE', '2'))
+strip = os.environ.get('LLAMA_GUI_STRIP', '0' if sys.platform == 'win32' else '1') == '1'
+upx = os.environ.get('LLAMA_GUI_UPX', '1') == '1'
+noarchive = os.environ.get('LLAMA_GUI_NOARCHIVE', '0') == '1'
+
+# The exclusion lists are maintained in build_exe.py
+sys.path.insert(0, SPECPATH)
+from build_exe import EXCLUDED_MODULES, UPX_EXCLUDES
+
+icon_ok = os.path.exists(os.path.join(SPECPATH, 'llama-cpp.ico'))
 
 
 a = Analysis(
     ['llama-server_gui_new.py'],
     pathex=[],
     binaries=[],
-    datas=[('llama-cpp.ico', '.')],
-    hiddenimports=['tkinter', 'tkinter.ttk', 'tkinter.filedialog', 'tkinter.messagebox', 'tkinter.scrolledtext', 'tkinter.font'],
+    datas=[('llama-cpp.ico', '.')] if icon_ok else [],
+    hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-    optimize=0,
+    excludes=list(EXCLUDED_MODULES),
+    noarchive=noarchive,
+    optimize=optimize,
 )
+
+# Tcl/Tk ships test suites, demos, message catalogs and legacy code pages that
+# a tkinter GUI never loads. The data directories are named tcl/tk (or
+# _tcl_data/_tk_data on PyInstaller 6+), optionally with a version suffix.
+def unused_tcl_tk_data(dest):
+    parts = dest.replace('\\', '/').split('/')
+    if len(parts) < 2 or not parts[0].lstrip('_').startswith(('tcl', 'tk')):
+        return False
+    if 'tests' in parts[1:] or 'demos' in parts[1:]:
+        return True
+    if parts[-2] == 'msgs':
+        return not parts[-1].startswith('en')
+    if parts[-2] == 'encoding':
+        name = parts[-1]
+        # Keep the Windows ANSI code pages; drop DOS OEM and Mac code pages
+        return name.startswith('mac') or (name.startswith('cp') and name[2:4] not in ('12', '87', '93', '94', '95'))
+    return False
+
+a.datas = [entry for entry in a.datas if not unused_tcl_tk_data(entry[0])]
+# CPython's own test extension modules are never imported by the GUI
+a.binaries = [entry for entry in a.binaries if not os.path.basename(entry[0]).startswith('_test')]
+
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
+exe_options = dict(
     name='LLaMA-Server-GUI',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    strip=strip,
+    upx=upx,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    icon=['llama-cpp.ico'],
+    icon=['llama-cpp.ico'] if icon_ok else None,
 )
+
+if bundle == 'onefile':
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        upx_exclude=list(UPX_EXCLUDES),
+        runtime_tmpdir=None,
+        **exe_options,
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        **exe_options,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=strip,
+        upx=upx,
+        upx_exclude=list(UPX_EXCLUDES),
+        name='LLaMA-Server-GUI',
+    )
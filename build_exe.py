@@ -1,82 +1,469 @@
 #!/usr/bin/env python3
 """
-Build script to create executable using PyInstaller
+Build script to create executable using PyInstaller (or Nuitka)
 Run this script to build the LLaMA Server GUI executable
 """
 
-import PyInstaller.__main__
+import argparse
+import compileall
+import hashlib
+import importlib.util
 import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+import venv
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 
-def build_executable():
-    """Build the executable using PyInstaller"""
+# Modules the GUI never imports but PyInstaller's dependency walker would
+# otherwise drag into the bundle. Build with --log-level=DEBUG to review
+# what is still included and extend this list; SPEC_FILE imports it from here.
+EXCLUDED_MODULES = (
+    'unittest', 'test', 'pydoc', 'distutils', 'lib2to3', 'email.test',
+    'http.server', 'xmlrpc', 'numpy', 'pandas', 'IPython', 'pytest', 'setuptools',
+)
+
+ICON_FILE = 'llama-cpp.ico'
+
+# Spec file used for regular builds. It carries hand-written post-Analysis
+# filtering (unused Tcl/Tk data), so it is committed and never regenerated.
+# Without it the build falls back to command-line options, whose generated
+# spec goes to the work directory so it can never take this one's place.
+# It reads the bundle mode, optimization, strip and UPX settings from the
+# LLAMA_GUI_* environment variables set by spec_env(), and imports
+# EXCLUDED_MODULES and UPX_EXCLUDES from this script.
+SPEC_FILE = 'LLaMA-Server-GUI.spec'
+
+# PyInstaller work directory kept outside the source tree so its analysis
+# cache survives checkouts and clean-ups of build/
+DEFAULT_CACHE_DIR = os.environ.get(
+    'LLAMA_GUI_BUILD_CACHE', os.path.join(tempfile.gettempdir(), 'llama-gui-pyi-cache'))
+
+# Inputs whose contents decide whether a previous build is still up to date
+BUILD_INPUTS = ('llama-server_gui_new.py', 'build_exe.py', 'requirements-build.txt',
+                ICON_FILE, SPEC_FILE)
+
+# Directories left alone when pre-compiling the sources
+SKIP_COMPILE_DIRS = re.compile(r'[\\/](\.build-venv|\.venv|venv|build|dist)[\\/]')
+
+# Packages in requirements-build.txt that only the build itself uses
+BUILD_ONLY_PACKAGES = ('pyinstaller', 'nuitka', 'autoflake', 'deptry')
+
+# Seconds before a stuck PyInstaller run is abandoned
+PYINSTALLER_TIMEOUT = 1800
+
+# Binaries that break when UPX-compressed (signed or loaded by name on Windows).
+# SPEC_FILE imports this list too.
+UPX_EXCLUDES = ('vcruntime140.dll', 'python3*.dll', 'tcl*.dll', 'tk*.dll')
+
+def parse_args(argv=None):
+    """Parse the build script command line options"""
+    parser = argparse.ArgumentParser(description="Build the LLaMA Server GUI executable")
+    parser.add_argument('--backend', choices=['pyinstaller', 'nuitka'], default='pyinstaller',
+                        help="Freeze with PyInstaller or compile ahead-of-time with Nuitka")
+    parser.add_argument('--no-venv', action='store_true',
+                        help="Build with the current interpreter instead of an isolated .build-venv")
+    parser.add_argument('--skip-prune', action='store_true',
+                        help="Do not strip unused imports with autoflake/deptry before building")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Discard PyInstaller's cached analysis and rebuild from scratch")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="PyInstaller work directory reused between builds "
+                             "(default: $LLAMA_GUI_BUILD_CACHE or %(default)s)")
+    bundle = parser.add_mutually_exclusive_group()
+    bundle.add_argument('--onedir', dest='bundle', action='store_const', const='onedir',
+                        help="Build a folder with the executable next to its files (default)")
+    bundle.add_argument('--onefile', dest='bundle', action='store_const', const='onefile',
+                        help="Build a single self-extracting executable (slower to start)")
+    parser.set_defaults(bundle='onedir')
+    parser.add_argument('--dev', action='store_true',
+                        help="Developer build: --onedir with loose .pyc files instead of a PYZ archive")
+    parser.add_argument('--variants', nargs='+', choices=['onedir', 'onefile'],
+                        help="Build several bundle modes in parallel (e.g. --variants onedir onefile)")
+    parser.add_argument('--no-optimize', dest='optimize', action='store_false',
+                        help="Keep docstrings and asserts (for libraries that rely on __doc__)")
+    parser.add_argument('--log-level', choices=['TRACE', 'DEBUG', 'INFO', 'WARN', 'ERROR'],
+                        help="PyInstaller log level (DEBUG lists every included module)")
+    parser.add_argument('--no-upx', dest='upx', action='store_false',
+                        help="Do not compress binaries with UPX even if it is installed")
+    parser.add_argument('--debug-symbols', action='store_true',
+                        help="Keep debug symbols in bundled binaries (readable crash dumps, larger bundle)")
+    options = parser.parse_args(argv)
     
-    # Define the build arguments
-    args = [
+    if options.dev:
+        options.bundle = 'onedir'
+        options.variants = None
+    return options
+
+def run_in_build_venv():
+    """Re-run this script inside .build-venv and return its exit code
+    
+    PyInstaller bundles whatever it can import from sys.path, so building from a
+    developer environment drags in unrelated packages. The venv is created once
+    and reused; requirements-build.txt is only re-applied after it changes.
+    """
+    venv_dir = '.build-venv'
+    stamp = os.path.join(venv_dir, '.requirements-hash')
+    if sys.platform == 'win32':
+        python = os.path.join(venv_dir, 'Scripts', 'python.exe')
+    else:
+        python = os.path.join(venv_dir, 'bin', 'python')
+    
+    if not os.path.exists(python):
+        print(f"Creating build environment in {venv_dir}...")
+        venv.create(venv_dir, with_pip=True)
+    
+    with open('requirements-build.txt', 'rb') as f:
+        requirements_hash = hashlib.sha256(f.read()).hexdigest()
+    try:
+        with open(stamp) as f:
+            installed_hash = f.read().strip()
+    except OSError:
+        installed_hash = None
+    if installed_hash != requirements_hash:
+        subprocess.run([python, '-m', 'pip', 'install', '-q', '-r', 'requirements-build.txt'], check=True)
+        with open(stamp, 'w') as f:
+            f.write(requirements_hash)
+    
+    env = {**os.environ, 'LLAMA_GUI_BUILD_VENV': '1'}
+    return subprocess.run([python, 'build_exe.py', *sys.argv[1:]], env=env).returncode
+
+def prune_imports():
+    """Remove unused imports so the freezer does not follow them
+    
+    Both tools only see static imports, so this is a last-resort lint rather
+    than a guarantee; modules imported dynamically still have to be listed as
+    hidden imports. Tools that are not installed are skipped, and any findings
+    are reported without stopping the build.
+    """
+    print("Pruning unused imports...")
+    for tool_args in (
+        ['autoflake', '--in-place', '--remove-all-unused-imports', 'llama-server_gui_new.py'],
+        # There is no pyproject.toml or requirements.txt, so check the GUI
+        # against requirements-build.txt, minus the packages only the build uses
+        ['deptry', '.', '--requirements-files', 'requirements-build.txt',
+         '--package-module-name-map', 'pillow=PIL',
+         '--per-rule-ignores', f"DEP002={'|'.join(BUILD_ONLY_PACKAGES)}",
+         '--extend-exclude', r'build_exe\.py|\.build-venv|build|dist'],
+    ):
+        if importlib.util.find_spec(tool_args[0]) is None:
+            print(f"⚠️ {tool_args[0]} not installed, skipping")
+            continue
+        result = subprocess.run([sys.executable, '-m', *tool_args], check=False)
+        if result.returncode != 0:
+            print(f"⚠️ {tool_args[0]} exited with code {result.returncode}")
+
+def build_args(variant, options):
+    """Build the PyInstaller argument list for one build variant"""
+    
+    upx_path = shutil.which('upx') if options.upx else None
+    
+    # Options PyInstaller takes both with SPEC_FILE and without it
+    args = []
+    if options.log_level:
+        args.append(f'--log-level={options.log_level}')
+    if upx_path:
+        args.append(f'--upx-dir={os.path.dirname(upx_path)}')
+    
+    # Reuse the cached analysis in the work directory unless a full rebuild is
+    # requested. For a complete invalidation, delete it and __pycache__/ manually.
+    args.extend([f"--workpath={variant['workpath']}", f"--distpath={variant['distpath']}"])
+    if options.fresh:
+        args.append('--clean')
+    
+    # The spec sets up the analysis itself, reading the remaining settings from
+    # the environment (see spec_env)
+    if os.path.exists(SPEC_FILE):
+        return [SPEC_FILE, '--noconfirm', *args]
+    
+    # Without the spec, every setting goes on the command line
+    args[:0] = [
         'llama-server_gui_new.py',              # Main script
-        '--onefile',                    # Create single executable
+        f"--{variant['bundle']}",       # One folder (fast startup) or single file
         '--windowed',                   # No console window (GUI app)
         '--name=LLaMA-Server-GUI',      # Name of the executable
-        '--icon=llama-cpp.ico',         # Icon file (if exists)
-        '--add-data=llama-cpp.ico;.',   # Include icon in bundle (Windows format)
-        '--clean',                      # Clean before building
         '--noconfirm',                  # Overwrite without asking
-        # Add hidden imports if needed
-        '--hidden-import=tkinter',
-        '--hidden-import=tkinter.ttk',
-        '--hidden-import=tkinter.filedialog',
-        '--hidden-import=tkinter.messagebox',
-        '--hidden-import=tkinter.scrolledtext',
-        '--hidden-import=tkinter.font',
+        # tkinter is found through the app's own imports and PyInstaller's
+        # stock hook; add --hidden-import only for modules reported missing
+        # in warn-LLaMA-Server-GUI.txt
     ]
+    args.extend(f'--exclude-module={module}' for module in EXCLUDED_MODULES)
     
-    # On Linux/Mac, use colon separator for add-data
-    if sys.platform != 'win32':
-        # Replace Windows path separator with Unix
-        for i, arg in enumerate(args):
-            if arg.startswith('--add-data='):
-                args[i] = arg.replace(';', ':')
+    # A missing icon would only fail late in analysis, so leave it out up front.
+    # The generated spec lives in the work directory and PyInstaller resolves
+    # relative paths from there, so pass the icon by absolute path.
+    if os.path.exists(ICON_FILE):
+        icon_path = os.path.abspath(ICON_FILE)
+        data_sep = ';' if sys.platform == 'win32' else ':'
+        args.append(f'--icon={icon_path}')                  # Executable icon
+        args.append(f'--add-data={icon_path}{data_sep}.')    # Include icon in bundle
+    else:
+        print(f"⚠️ {ICON_FILE} not found, building without an icon")
     
-    print("Building executable with PyInstaller...")
-    print(f"Arguments: {' '.join(args)}")
+    # Compress bundled binaries with UPX when available to shrink the payload
+    if upx_path:
+        args.extend(f'--upx-exclude={name}' for name in UPX_EXCLUDES)
+    else:
+        args.append('--noupx')
+    
+    if options.optimize:
+        args.append('--optimize=2')
+    
+    # Loose modules import straight from disk, which is quicker to start and to
+    # refresh during development; release builds keep the archive
+    if options.dev:
+        args.append('--noarchive')
     
+    # Drop debug symbols from the bootloader and shared objects. They are never
+    # read at runtime, at the cost of making crashes harder to dissect.
+    if sys.platform != 'win32' and not options.debug_symbols:
+        args.append('--strip')
+    
+    # Keep the generated spec in the work directory: written to the repo root
+    # it would be picked up as SPEC_FILE by later builds, which would then ignore
+    # the LLAMA_GUI_* settings. Parallel variants have separate work directories,
+    # so they never share a spec either.
+    args.append(f"--specpath={variant['workpath']}")
+    
+    return args
+
+def spec_env(variant, options):
+    """Environment passing the analysis options to SPEC_FILE"""
+    return {
+        **os.environ,
+        'LLAMA_GUI_BUNDLE': variant['bundle'],
+        'LLAMA_GUI_OPTIMIZE': '2' if options.optimize else '0',
+        'LLAMA_GUI_STRIP': '1' if sys.platform != 'win32' and not options.debug_symbols else '0',
+        'LLAMA_GUI_UPX': '1' if options.upx else '0',
+        'LLAMA_GUI_NOARCHIVE': '1' if options.dev else '0',
+    }
+
+def make_variants(bundles, cache_dir):
+    """Describe one build per bundle mode, isolating them when there are several"""
+    if len(bundles) == 1:
+        return [{'name': bundles[0], 'bundle': bundles[0],
+                 'workpath': cache_dir, 'distpath': 'dist'}]
+    return [
+        {'name': bundle, 'bundle': bundle,
+         'workpath': os.path.join(cache_dir, bundle), 'distpath': os.path.join('dist', bundle)}
+        for bundle in bundles
+    ]
+
+def executable_path(variant):
+    """Location of the executable produced by a build variant"""
+    if sys.platform == 'win32':
+        exe_name = "LLaMA-Server-GUI.exe"
+    else:
+        exe_name = "LLaMA-Server-GUI"
+    
+    if variant['bundle'] == 'onedir':
+        return os.path.join(variant['distpath'], "LLaMA-Server-GUI", exe_name)
+    return os.path.join(variant['distpath'], exe_name)
+
+def build_hash(args, env):
+    """Hash everything that affects the output of one PyInstaller build"""
+    h = hashlib.sha256()
+    for path in sorted(BUILD_INPUTS):
+        h.update(path.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    try:
+        pyinstaller_version = metadata.version('pyinstaller')
+    except metadata.PackageNotFoundError:
+        pyinstaller_version = ''
+    h.update(f"{sys.version}|{pyinstaller_version}".encode())
+    h.update('\0'.join(args).encode())
+    h.update('\0'.join(f'{k}={v}' for k, v in sorted(env.items()) if k.startswith('LLAMA_GUI_')).encode())
+    return h.hexdigest()
+
+def hash_file(variant):
+    """Sentinel recording the inputs of the last successful build"""
+    return os.path.join(variant['distpath'], '.build-hash')
+
+def is_up_to_date(variant, digest):
+    """True when the executable exists and was built from identical inputs"""
+    if not os.path.exists(executable_path(variant)):
+        return False
     try:
-        PyInstaller.__main__.run(args)
-        print("\n✅ Build completed successfully!")
-        print("📁 Check the 'dist' folder for your executable")
+        with open(hash_file(variant)) as f:
+            return f.read().strip() == digest
+    except OSError:
+        return False
+
+def run_pyinstaller(args, env):
+    """Run PyInstaller in its own process so no state leaks between builds"""
+    subprocess.run([sys.executable, '-m', 'PyInstaller', *args],
+                   env=env, check=True, timeout=PYINSTALLER_TIMEOUT)
+
+def build_executable(options):
+    """Build the executable using PyInstaller"""
+    
+    # Strip docstrings and asserts from the bundled bytecode (like python -OO).
+    # PYTHONOPTIMIZE covers older PyInstaller releases without --optimize.
+    if options.optimize:
+        os.environ['PYTHONOPTIMIZE'] = '2'
+    
+    variants = make_variants(options.variants or [options.bundle], options.cache_dir)
+    builds = [(variant, build_args(variant, options), spec_env(variant, options))
+              for variant in variants]
+    
+    # Skip variants whose inputs are unchanged since their last build
+    digests = {variant['name']: build_hash(args, env) for variant, args, env in builds}
+    if not options.fresh:
+        pending = []
+        for build in builds:
+            variant = build[0]
+            if is_up_to_date(variant, digests[variant['name']]):
+                print(f"✅ {executable_path(variant)} is up to date")
+            else:
+                pending.append(build)
+        builds = pending
+        if not builds:
+            return True
+    
+    # Only prune once something needs building. It may edit the sources, so
+    # the recorded hashes are taken again afterwards.
+    if not options.skip_prune:
+        prune_imports()
+        digests = {variant['name']: build_hash(args, env) for variant, args, env in builds}
+    
+    # Warm __pycache__ on all cores at the level PyInstaller compiles at. Each
+    # optimization level has its own .pyc name, so other levels never clash.
+    compileall.compile_dir('.', quiet=1, workers=0, optimize=2 if options.optimize else 0,
+                           rx=SKIP_COMPILE_DIRS)
+    
+    print("Building executable with PyInstaller...")
+    if os.path.exists(SPEC_FILE):
+        print(f"Using {SPEC_FILE}")
+    for variant, args, _ in builds:
+        print(f"Arguments ({variant['name']}): {' '.join(args)}")
+    
+    failed = []
+    if len(builds) == 1:
+        try:
+            run_pyinstaller(*builds[0][1:])
+        except Exception as e:
+            print(f"❌ Build failed: {e}")
+            return False
+    else:
+        # Independent variants overlap their CPU-bound compile/compress phases.
+        # Each build is already a separate process, so threads only wait on them.
+        with ThreadPoolExecutor(max_workers=len(builds)) as executor:
+            futures = [(variant, executor.submit(run_pyinstaller, args, env))
+                       for variant, args, env in builds]
+            for variant, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Build failed ({variant['name']}): {e}")
+                    failed.append(variant)
+    
+    # Report results one variant at a time
+    for variant, _, _ in builds:
+        if variant in failed:
+            continue
+        print(f"\n✅ Build completed successfully! ({variant['name']})")
+        if variant['bundle'] == 'onedir':
+            print(f"📁 Distribute the whole '{variant['distpath']}/LLaMA-Server-GUI' folder")
+        else:
+            print(f"📁 Check the '{variant['distpath']}' folder for your executable")
         
         # Print the location of the executable
-        if sys.platform == 'win32':
-            exe_name = "LLaMA-Server-GUI.exe"
-        else:
-            exe_name = "LLaMA-Server-GUI"
-            
-        exe_path = os.path.join("dist", exe_name)
+        exe_path = executable_path(variant)
         if os.path.exists(exe_path):
             print(f"📄 Executable created: {exe_path}")
-        
-    except Exception as e:
+            with open(hash_file(variant), 'w') as f:
+                f.write(digests[variant['name']])
+    
+    return not failed
+
+def build_with_nuitka(options):
+    """Compile the executable to native code using Nuitka"""
+    
+    args = [
+        sys.executable, '-m', 'nuitka',
+        '--onefile' if options.bundle == 'onefile' else '--standalone',
+        '--enable-plugin=tk-inter',                 # Bundle Tcl/Tk for tkinter
+        '--windows-console-mode=disable',           # No console window (GUI app)
+        '--output-filename=LLaMA-Server-GUI',
+        '--output-dir=dist',
+        '--assume-yes-for-downloads',               # Stay non-interactive
+    ]
+    
+    if os.path.exists(ICON_FILE):
+        args.append(f'--include-data-files={ICON_FILE}={ICON_FILE}')
+        if sys.platform == 'win32':
+            args.append(f'--windows-icon-from-ico={ICON_FILE}')
+    else:
+        print(f"⚠️ {ICON_FILE} not found, building without an icon")
+    
+    # Same effect as PyInstaller's --optimize=2
+    if options.optimize:
+        args.append('--python-flag=no_docstrings,no_asserts')
+    
+    # Nuitka keeps its bytecode and C compilation caches between runs, so only
+    # drop them when a fresh build is requested
+    if options.fresh:
+        args.append('--clean-cache=all')
+    
+    args.append('llama-server_gui_new.py')
+    
+    print("Building executable with Nuitka...")
+    print(f"Arguments: {' '.join(args)}")
+    
+    try:
+        subprocess.run(args, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
         print(f"❌ Build failed: {e}")
         return False
     
+    print("\n✅ Build completed successfully!")
+    print("📁 Check the 'dist' folder for your executable")
     return True
 
 if __name__ == "__main__":
-    # Check if PyInstaller is installed
-    try:
-        import PyInstaller
-        print(f"PyInstaller version: {PyInstaller.__version__}")
-    except ImportError:
-        print("❌ PyInstaller not found. Install it with: pip install pyinstaller")
-        sys.exit(1)
+    options = parse_args()
+    
+    if not options.no_venv and os.environ.get('LLAMA_GUI_BUILD_VENV') != '1':
+        try:
+            sys.exit(run_in_build_venv())
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Could not set up the build environment: {e}")
+            sys.exit(1)
+    
+    # Check if the selected backend is installed
+    if options.backend == 'nuitka':
+        try:
+            import nuitka
+            print("Nuitka found")
+        except ImportError:
+            print("❌ Nuitka not found. Install it with: pip install nuitka")
+            sys.exit(1)
+    else:
+        try:
+            import PyInstaller
+            print(f"PyInstaller version: {PyInstaller.__version__}")
+        except ImportError:
+            print("❌ PyInstaller not found. Install it with: pip install pyinstaller")
+            sys.exit(1)
     
     # Check if main script exists
     if not os.path.exists("llama-server_gui_new.py"):
         print("❌ llama-server_gui_new.py not found in current directory")
         sys.exit(1)
     
-    # Build the executable
-    success = build_executable()
+    # Build the executable. PyInstaller builds prune imports themselves, once
+    # they know the previous build is out of date.
+    if options.backend == 'nuitka':
+        if not options.skip_prune:
+            prune_imports()
+        success = build_with_nuitka(options)
+    else:
+        success = build_executable(options)
     
     if success:
         print("\n🎉 Your LLaMA Server GUI is ready to use!")
@@ -4,14 +4,14 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.dialogs import Messagebox
 from ttkbootstrap.scrolled import ScrolledText, ScrolledFrame
-from ttkbootstrap.tooltip import ToolTip
-from tkinter import filedialog
+from tkinter import font as tkfont
 
-import subprocess
 import threading
+import time
+import collections
+import codecs
 import os
 import json
-import webbrowser
 
 try:
     import pystray
@@ -21,7 +21,147 @@ try:
 except ImportError:
     TRAY_AVAILABLE = False
 
+# Config (de)serialisation to and from bytes: orjson when available, json otherwise
+try:
+    import orjson
+
+    def _dumps_config(config):
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+
+    _loads_config = orjson.loads
+except ImportError:
+    def _dumps_config(config):
+        return json.dumps(config, indent=4).encode('utf-8')
+
+    _loads_config = json.loads
+
+class TooltipManager:
+    """Shows tooltips for many widgets through one shared, reused popup window."""
+
+    def __init__(self, root, delay=500, wraplength=300):
+        self.root = root
+        self.delay = delay
+        self.wraplength = wraplength
+        self.texts = {}
+        self.after_id = None
+        self.tip = None
+        self.label = None
+        ttk.Style().configure("tooltip.TLabel", background="#fffddd", foreground="#333",
+                              bordercolor="#888", borderwidth=1, relief=RAISED)
+        # One set of application-wide bindings; events for widgets without a
+        # registered text are ignored by a dict lookup.
+        root.bind_all("<Enter>", self._schedule, add="+")
+        root.bind_all("<Leave>", self._hide, add="+")
+        root.bind_all("<ButtonPress>", self._hide, add="+")
+        root.bind_all("<Destroy>", self._forget, add="+")
+
+    def register(self, widget, text):
+        """Attach a tooltip text to a widget."""
+        self.texts[str(widget)] = text
+
+    def _forget(self, event):
+        self.texts.pop(str(event.widget), None)
+
+    def _schedule(self, event):
+        if str(event.widget) not in self.texts:
+            return
+        # Wait before showing so the pointer merely passing over builds nothing
+        self._cancel()
+        self.after_id = self.root.after(self.delay, self._show, event.widget)
+
+    def _cancel(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def _show(self, widget):
+        self.after_id = None
+        text = self.texts.get(str(widget))
+        if not text:
+            return
+        if self.tip is None:
+            self.tip = ttk.Toplevel(self.root, overrideredirect=True, alpha=0.95)
+            self.tip.withdraw()
+            self.label = ttk.Label(self.tip, justify=LEFT, wraplength=self.wraplength, padding=10, style="tooltip.TLabel")
+            self.label.pack(fill=BOTH, expand=YES)
+        self.label.config(text=text)
+        self.tip.wm_geometry(f"+{widget.winfo_pointerx() + 25}+{widget.winfo_pointery() + 10}")
+        self.tip.deiconify()
+        self.tip.lift()
+
+    def _hide(self, event=None):
+        self._cancel()
+        if self.tip is not None:
+            self.tip.withdraw()
+
 class LlamaServerGUI:
+    # Combobox choices, shared by every instance
+    CHAT_TEMPLATES = ("", "bailing", "chatglm3", "chatglm4", "chatml", "command-r", "deepseek", "deepseek2", "gemma", "llama2", "llama3", "mistral", "openchat", "phi3", "vicuna", "zephyr")
+    REASONING_FORMATS = ("", "auto", "none", "deepseek")
+    REASONING_LEVELS = ("", "low", "medium", "high")
+    FLASH_ATTN_OPTIONS = ("on", "off", "auto")
+    # --chat-template-kwargs values for the listed reasoning levels, encoded once
+    _REASONING_KWARGS = {level: json.dumps({"reasoning_effort": level}) for level in REASONING_LEVELS if level}
+
+    # Server log lines kept in the output view; older lines are dropped in batches,
+    # with the line count looked up each time LOG_TRIM_SLACK new lines have arrived.
+    MAX_LOG_LINES = 5000
+    LOG_TRIM_SLACK = 500
+    # Delay between drains of queued server output, in milliseconds
+    OUTPUT_POLL_MS = 30
+    # Seconds the server's output is still read after a stop request
+    STOP_DRAIN_SECONDS = 5
+    # While hidden to the tray, queued output is cut back to the last
+    # MAX_LOG_LINES lines whenever this many chunks have piled up
+    HIDDEN_QUEUE_CHUNKS = 256
+
+    # (flag, variable name) pairs used by generate_command
+    _STR_ARGS = (
+        ('--host', 'host'), ('--port', 'port'), ('-a', 'alias'),
+        ('--api-key', 'api_key'), ('-t', 'threads'), ('-b', 'batch_size'),
+        ('-np', 'parallel'), ('--lora', 'lora_path'),
+        ('--mmproj', 'mmproj_path'), ('--chat-template', 'chat_template'),
+        ('-md', 'draft_model_path'), ('-ngld', 'draft_gpu_layers'),
+        ('--draft', 'draft_tokens'), ('--n-cpu-moe', 'moe_cpu_layers'),
+        ('--reasoning-format', 'reasoning_format'), ('-ub', 'ubatch_size'),
+        ('-n', 'n_predict'), ('--temp', 'temp'), ('--top-k', 'top_k'),
+        ('--top-p', 'top_p'), ('--repeat-penalty', 'repeat_penalty'),
+    )
+    _BOOL_ARGS = (
+        ('--no-mmap', 'no_mmap'),
+        ('--no-webui', 'no_webui'), ('-cb', 'cont_batching'),
+        ('--mlock', 'mlock'), ('--embedding', 'embedding'),
+        ('--jinja', 'jinja'), ('-v', 'verbose'),
+        ('--ignore-eos', 'ignore_eos'),
+    )
+    # (variable name, Tk variable class, default) for every setting. Drives
+    # variable creation, save_config/load_config and the command cache.
+    _FIELDS = (
+        # Models
+        ('model_path', tk.StringVar, ''), ('alias', tk.StringVar, ''),
+        ('lora_path', tk.StringVar, ''), ('mmproj_path', tk.StringVar, ''),
+        ('chat_template', tk.StringVar, ''), ('reasoning_format', tk.StringVar, ''),
+        ('reasoning_effort', tk.StringVar, ''), ('jinja', tk.BooleanVar, False),
+        # Generation
+        ('n_predict', tk.StringVar, ''), ('ignore_eos', tk.BooleanVar, False),
+        ('temp', tk.StringVar, ''), ('top_k', tk.StringVar, ''),
+        ('top_p', tk.StringVar, ''), ('repeat_penalty', tk.StringVar, ''),
+        # Performance
+        ('ctx_size', tk.IntVar, 4096), ('gpu_layers', tk.IntVar, 99),
+        ('threads', tk.StringVar, ''), ('batch_size', tk.StringVar, ''),
+        ('ubatch_size', tk.StringVar, ''), ('parallel', tk.StringVar, ''),
+        ('cont_batching', tk.BooleanVar, False),
+        # Advanced
+        ('flash_attn', tk.StringVar, 'auto'), ('moe_cpu_layers', tk.StringVar, ''),
+        ('mlock', tk.BooleanVar, False), ('no_mmap', tk.BooleanVar, False),
+        ('numa', tk.BooleanVar, False), ('draft_model_path', tk.StringVar, ''),
+        ('draft_gpu_layers', tk.StringVar, ''), ('draft_tokens', tk.StringVar, ''),
+        # Server & API
+        ('host', tk.StringVar, '127.0.0.1'), ('port', tk.StringVar, '8080'),
+        ('api_key', tk.StringVar, ''), ('no_webui', tk.BooleanVar, False),
+        ('embedding', tk.BooleanVar, False), ('verbose', tk.BooleanVar, False),
+    )
+
     def __init__(self, root):
         self.root = root
         self.root.title("LLaMA Server GUI Manager")
@@ -35,17 +175,53 @@ class LlamaServerGUI:
         # System tray setup
         self.tray_icon = None
         self.is_in_tray = False
+        self._tray_image = None
 
         # Use user's directory for portable config file
         self.config_file = self.get_config_path("llama_server_config.json")
+        # Last config read or written, and the (mtime, size) of the file it came from
+        self._cached_config = None
+        self._cached_stat = None
+        # Last directory a file was picked from, keyed by file extension
+        self._last_dirs = {}
+        # (settings signature, command list, display string) of the last command built
+        self._cmd_cache = None
 
         # Store slider references for updating on load
         self.slider_refs = {}
+        # Rounded slider values waiting to be written back, flushed together
+        # by a single 'after' callback while a slider is being dragged
+        self._slider_pending = {}
+        self._slider_flush_id = None
         
         # Data store for custom arguments
         self.custom_arguments = []
-
+        # Values present in custom_arguments, for constant-time duplicate checks
+        self._custom_arg_values = set()
+        self.custom_args_list_frame = None
+        # Row frame of each listed argument, keyed by id() of its dict
+        self._arg_rows = {}
+
+        # Named monospace font for the server log
+        self.mono_font = tkfont.Font(root=self.root, name="LlamaMono", family="Consolas", size=10)
+
+        # One shared tooltip popup for every widget
+        self.tooltips = TooltipManager(self.root)
+
+        # Server output waiting to be written to the log view. The reader thread
+        # appends here and _flush_output drains it on the Tk thread in batches.
+        self._out_queue = collections.deque()
+        self._lines_since_trim = 0
+        # Set by stop_server to make the current reader thread stop reading
+        self._stop_evt = threading.Event()
+        self._reader = None
+
+        self.setup_variables()
         self.setup_ui()
+        # main() builds the UI with the window withdrawn; show it after one
+        # layout pass, before load_config so its error dialog has a visible parent
+        self.root.update_idletasks()
+        self.root.deiconify()
         self.load_config()
 
     def get_config_path(self, filename):
@@ -59,6 +235,11 @@ class LlamaServerGUI:
         
         return os.path.join(app_dir, filename)
 
+    def setup_variables(self):
+        """Creates the Tk variables behind every setting, independent of the tab widgets."""
+        for name, var_cls, default in self._FIELDS:
+            setattr(self, name, var_cls(value=default))
+
     def setup_ui(self):
         """Sets up the main UI layout, including notebook and control buttons."""
         main_container = ttk.Frame(self.root, padding="10")
@@ -72,7 +253,7 @@ class LlamaServerGUI:
         left_button_frame = ttk.Frame(control_frame)
         left_button_frame.pack(side=tk.LEFT)
         self.create_button(left_button_frame, "Save Config 💾", self.save_config, "Save the current settings.", bootstyle="secondary")
-        self.create_button(left_button_frame, "Load Config 📂", self.load_config, "Load settings from the config file.", bootstyle="secondary")
+        self.create_button(left_button_frame, "Load Config 📂", lambda: self.load_config(force=True), "Load settings from the config file.", bootstyle="secondary")
         self.create_button(left_button_frame, "Generate Command ⚡", self.show_command, "Show the final command to be executed.", bootstyle="info")
 
         # Right-aligned buttons
@@ -83,7 +264,7 @@ class LlamaServerGUI:
         self.start_button = self.create_button(right_button_frame, "Start Server ▶️", self.start_server, "Start the server with current settings.", bootstyle="success")
 
         # --- Notebook (Packed SECOND to fill the remaining space) ---
-        notebook = ttk.Notebook(main_container, bootstyle="primary")
+        self.notebook = notebook = ttk.Notebook(main_container, bootstyle="primary")
         notebook.pack(fill=tk.BOTH, expand=True)
 
         # --- Create Tab Frames ---
@@ -92,7 +273,7 @@ class LlamaServerGUI:
         performance_core_frame = ttk.Frame(notebook, padding="10")
         performance_advanced_frame = ttk.Frame(notebook, padding="10")
         server_api_frame = ttk.Frame(notebook, padding="10")
-        output_frame = ttk.Frame(notebook, padding="10")
+        self.output_frame = output_frame = ttk.Frame(notebook, padding="10")
 
         notebook.add(model_frame, text="  Models ")
         notebook.add(generation_frame, text=" Generation ")
@@ -102,12 +283,30 @@ class LlamaServerGUI:
         notebook.add(output_frame, text=" Server Output ")
 
         # --- Populate Tabs ---
+        # Only the first tab is built up front; the others are built the first
+        # time they are selected (or needed, like the output log on start).
         self.setup_model_tab(model_frame)
-        self.setup_generation_tab(generation_frame)
-        self.setup_performance_core_tab(performance_core_frame)
-        self.setup_performance_advanced_tab(performance_advanced_frame)
-        self.setup_server_api_tab(server_api_frame)
-        self.setup_output_tab(output_frame)
+        self._tab_builders = {
+            str(generation_frame): (self.setup_generation_tab, generation_frame),
+            str(performance_core_frame): (self.setup_performance_core_tab, performance_core_frame),
+            str(performance_advanced_frame): (self.setup_performance_advanced_tab, performance_advanced_frame),
+            str(server_api_frame): (self.setup_server_api_tab, server_api_frame),
+            str(output_frame): (self.setup_output_tab, output_frame),
+        }
+        self._tab_changed_id = notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, event):
+        self.build_tab(self.notebook.select())
+
+    def build_tab(self, frame):
+        """Builds a tab's widgets if that has not happened yet."""
+        builder = self._tab_builders.pop(str(frame), None)
+        if builder:
+            setup_tab, parent = builder
+            setup_tab(parent)
+            if not self._tab_builders:
+                # Every tab exists now; tab switches no longer need a callback
+                self.notebook.unbind("<<NotebookTabChanged>>", self._tab_changed_id)
 
 
     # --- Tab Setup Methods ---
@@ -116,35 +315,27 @@ class LlamaServerGUI:
         # --- Primary Model ---
         model_group = ttk.Labelframe(parent, text="Primary Model", padding="10")
         model_group.pack(fill=tk.X, pady=5)
-        self.model_path = tk.StringVar()
+        model_group.columnconfigure(1, weight=1)
         self.create_file_entry(model_group, "Model Path (-m):", self.model_path, "Path to the GGUF model file.", ".gguf", row=0)
-        self.alias = tk.StringVar()
         self.create_entry(model_group, "Model Alias (-a):", self.alias, "Set an alias for the model (used in API calls).", row=1)
 
         # --- Model Extensions ---
         ext_group = ttk.Labelframe(parent, text="Model Extensions", padding="10")
         ext_group.pack(fill=tk.X, pady=5)
-        self.lora_path = tk.StringVar()
+        ext_group.columnconfigure(1, weight=1)
         self.create_file_entry(ext_group, "LoRA Path (--lora):", self.lora_path, "Path to a LoRA adapter file (optional).", ".gguf", row=0)
-        self.mmproj_path = tk.StringVar()
         self.create_file_entry(ext_group, "Multimodal Projector (--mmproj):", self.mmproj_path, "Path to a multimodal projector file (for vision models).", ".gguf", row=1)
 
         # --- Chat Behavior ---
         chat_group = ttk.Labelframe(parent, text="Chat Behavior", padding="10")
         chat_group.pack(fill=tk.X, pady=5)
-        self.chat_template = tk.StringVar()
-        chat_templates = ["", "bailing", "chatglm3", "chatglm4", "chatml", "command-r", "deepseek", "deepseek2", "gemma", "llama2", "llama3", "mistral", "openchat", "phi3", "vicuna", "zephyr"]
-        self.create_combobox(chat_group, "Template (--chat-template):", self.chat_template, "Select a chat template (leave blank for auto-detection).", chat_templates, row=0)
+        chat_group.columnconfigure(1, weight=1)
+        self.create_combobox(chat_group, "Template (--chat-template):", self.chat_template, "Select a chat template (leave blank for auto-detection).", self.CHAT_TEMPLATES, row=0)
 
-        self.reasoning_format = tk.StringVar()
-        reasoning_formats = ["", "auto", "none", "deepseek"]
-        self.create_combobox(chat_group, "Reasoning Format (--reasoning-format):", self.reasoning_format, "Controls whether thought tags are allowed and/or extracted from the response.", reasoning_formats, row=1)
+        self.create_combobox(chat_group, "Reasoning Format (--reasoning-format):", self.reasoning_format, "Controls whether thought tags are allowed and/or extracted from the response.", self.REASONING_FORMATS, row=1)
 
-        self.reasoning_effort = tk.StringVar()
-        reasoning_levels = ["", "low", "medium", "high"]
-        self.create_combobox(chat_group, "Reasoning Effort:", self.reasoning_effort, "Set reasoning effort for chat template kwargs (some models).", reasoning_levels, row=2)
+        self.create_combobox(chat_group, "Reasoning Effort:", self.reasoning_effort, "Set reasoning effort for chat template kwargs (some models).", self.REASONING_LEVELS, row=2)
         
-        self.jinja = tk.BooleanVar(value=False)
         self.create_checkbutton(chat_group, "Enable Jinja (--jinja)", self.jinja, "Enable Jinja2 templating (required for some custom templates).", row=3)
 
     def setup_generation_tab(self, parent):
@@ -153,26 +344,20 @@ class LlamaServerGUI:
         output_group = ttk.Labelframe(parent, text="Output Control", padding="10")
         output_group.pack(fill=tk.X, pady=5, side=tk.TOP)
         
-        self.n_predict = tk.StringVar(value="")
         self.create_spinbox(output_group, "Tokens to Generate (-n, --n-predict):", self.n_predict, "Number of tokens to generate (default -1 = infinite).", from_=-1, to=131072, increment=1, row=0)
         
-        self.ignore_eos = tk.BooleanVar(value=False)
         self.create_checkbutton(output_group, "Ignore End-of-Sequence (--ignore-eos)", self.ignore_eos, "Prevents model from stopping early.", row=1)
         
         # --- Sampling Parameters ---
         sampling_group = ttk.Labelframe(parent, text="Sampling Parameters", padding="10")
         sampling_group.pack(fill=tk.X, pady=5)
         
-        self.temp = tk.StringVar(value="")
         self.create_spinbox(sampling_group, "Temperature (--temp):", self.temp, "Creativity level (default 0.8). Lower = deterministic, higher = creative.", from_=0, to=2, increment=0.1, row=0)
 
-        self.top_k = tk.StringVar(value="")
         self.create_spinbox(sampling_group, "Top-K (--top-k):", self.top_k, "Keep only top-k tokens when sampling (default 40).", from_=0, to=1000, increment=1, row=1)
         
-        self.top_p = tk.StringVar(value="")
         self.create_spinbox(sampling_group, "Top-P (--top-p):", self.top_p, "Nucleus sampling (default 0.9).", from_=0, to=1, increment=0.1, row=2)
 
-        self.repeat_penalty = tk.StringVar(value="")
         self.create_spinbox(sampling_group, "Repeat Penalty (--repeat-penalty):", self.repeat_penalty, "Penalizes repetition (default 1.0). Increase to reduce loops.", from_=0, to=2, increment=0.1, row=3)
 
     def setup_performance_core_tab(self, parent):
@@ -180,23 +365,17 @@ class LlamaServerGUI:
         # --- Core Performance ---
         core_group = ttk.Labelframe(parent, text="Core Performance", padding="10")
         core_group.pack(fill=tk.X, pady=5, side=tk.TOP)
-        self.ctx_size = tk.IntVar(value=4096)
+        core_group.columnconfigure(1, weight=1)
         self.create_slider(core_group, "Context Size (-c):", self.ctx_size, "Context size (sequence length) for the model.", from_=0, to=131072, resolution=1024, row=0)
-        self.gpu_layers = tk.IntVar(value=99)
         self.create_slider(core_group, "GPU Layers (-ngl):", self.gpu_layers, "Number of model layers to offload to GPU (99 for all).", from_=0, to=99, resolution=1, row=1)
-        self.threads = tk.StringVar(value="")
         self.create_spinbox(core_group, "CPU Threads (-t):", self.threads, "Number of CPU threads to use (e.g., 8).", from_=1, to=128, increment=1, row=2)
-        self.batch_size = tk.StringVar(value="")
         self.create_spinbox(core_group, "Batch Size (-b):", self.batch_size, "Batch size for prompt processing (e.g., 2048).", from_=1, to=8192, increment=1, row=3)
-        self.ubatch_size = tk.StringVar(value="")
         self.create_spinbox(core_group, "Physical Batch Size (-ub):", self.ubatch_size, "Physical batch size. Lower values reduce VRAM use but slow things down.", from_=1, to=1024, increment=1, row=4)
 
         # --- Advanced Throughput ---
         throughput_group = ttk.Labelframe(parent, text="Advanced Throughput", padding="10")
         throughput_group.pack(fill=tk.X, pady=5)
-        self.parallel = tk.StringVar(value="")
         self.create_spinbox(throughput_group, "Parallel Sequences (-np):", self.parallel, "Number of parallel sequences to process (e.g., 4).", row=0, from_=1, to=16, increment=1)
-        self.cont_batching = tk.BooleanVar(value=False)
         self.create_checkbutton(throughput_group, "Continuous Batching (-cb)", self.cont_batching, "Enable continuous batching for higher throughput.", row=1)
 
     def setup_performance_advanced_tab(self, parent):
@@ -204,26 +383,19 @@ class LlamaServerGUI:
         # --- Memory & Optimizations ---
         mem_group = ttk.Labelframe(parent, text="Memory & Optimizations", padding="10")
         mem_group.pack(fill=tk.X, pady=5)
-        self.flash_attn = tk.StringVar(value="auto")
-        flash_attn_options = ["on", "off", "auto"]
-        self.create_combobox(mem_group, "Flash Attention (-fa):", self.flash_attn, "Set Flash Attention use ('on', 'off', or 'auto', default: 'auto').", flash_attn_options, row=0)
-        self.moe_cpu_layers = tk.StringVar(value="")
+        mem_group.columnconfigure(1, weight=1)
+        self.create_combobox(mem_group, "Flash Attention (-fa):", self.flash_attn, "Set Flash Attention use ('on', 'off', or 'auto', default: 'auto').", self.FLASH_ATTN_OPTIONS, row=0)
         self.create_spinbox(mem_group, "MoE CPU Layers (--n-cpu-moe):", self.moe_cpu_layers, "MoE layers to keep on CPU if model doesn't fit on GPU.", row=1, from_=0, to=99, increment=1)
-        self.mlock = tk.BooleanVar(value=False)
         self.create_checkbutton(mem_group, "Memory Lock (--mlock)", self.mlock, "Lock model in RAM to prevent swapping.", row=2)
-        self.no_mmap = tk.BooleanVar(value=False)
         self.create_checkbutton(mem_group, "No Memory Mapping (--no-mmap)", self.no_mmap, "Disable memory mapping of the model file.", row=3)
-        self.numa = tk.BooleanVar(value=False)
         self.create_checkbutton(mem_group, "NUMA Optimizations (--numa)", self.numa, "Enable NUMA-aware optimizations for specific hardware.", row=4)
 
         # --- Speculative Decoding ---
         spec_group = ttk.Labelframe(parent, text="Speculative Decoding", padding="10")
         spec_group.pack(fill=tk.X, pady=5)
-        self.draft_model_path = tk.StringVar()
+        spec_group.columnconfigure(1, weight=1)
         self.create_file_entry(spec_group, "Draft Model (-md):", self.draft_model_path, "Path to the draft model for speculative decoding.", ".gguf", row=0)
-        self.draft_gpu_layers = tk.StringVar(value="")
         self.create_spinbox(spec_group, "Draft GPU Layers (-ngld):", self.draft_gpu_layers, "Number of GPU layers for the draft model.", row=1, from_=0, to=99, increment=1)
-        self.draft_tokens = tk.StringVar(value="")
         self.create_spinbox(spec_group, "Draft Tokens (--draft):", self.draft_tokens, "Number of tokens to draft (e.g., 5).", row=2, from_=1, to=1024, increment=1)
 
     def setup_server_api_tab(self, parent):
@@ -235,20 +407,15 @@ class LlamaServerGUI:
         net_group = ttk.Labelframe(parent, text="Network Configuration", padding="10")
         net_group.grid(row=0, column=0, sticky=EW, pady=5)
         net_group.columnconfigure(1, weight=1)
-        self.host = tk.StringVar(value="127.0.0.1")
         self.create_entry(net_group, "Host (--host):", self.host, "IP address to listen on (0.0.0.0 for network access).", row=0)
-        self.port = tk.StringVar(value="8080")
         self.create_entry(net_group, "Port (--port):", self.port, "Network port for the server to listen on.", row=1)
 
         # --- Access & Features ---
         access_group = ttk.Labelframe(parent, text="Access & Features", padding="10")
         access_group.grid(row=1, column=0, sticky=EW, pady=5)
         access_group.columnconfigure(1, weight=1)
-        self.api_key = tk.StringVar()
         self.create_entry(access_group, "API Key (--api-key):", self.api_key, "API key for bearer token authentication (optional).", row=0)
-        self.no_webui = tk.BooleanVar(value=False)
         self.create_checkbutton(access_group, "Disable Web UI (--no-webui)", self.no_webui, "Disable the built-in web interface.", row=1)
-        self.embedding = tk.BooleanVar(value=False)
         self.create_checkbutton(access_group, "Embeddings Only (--embedding)", self.embedding, "Enable embedding-only mode (disables chat).", row=2)
 
         # --- Custom Arguments Management ---
@@ -263,7 +430,7 @@ class LlamaServerGUI:
         add_arg_frame.columnconfigure(0, weight=1)
         self.new_arg_entry = ttk.Entry(add_arg_frame)
         self.new_arg_entry.grid(row=0, column=0, sticky=EW, padx=(0, 5))
-        ToolTip(self.new_arg_entry, "Enter a full argument with its value (e.g., --my-flag value) and press Add.")
+        self.tooltips.register(self.new_arg_entry, "Enter a full argument with its value (e.g., --my-flag value) and press Add.")
         add_button = ttk.Button(add_arg_frame, text="Add", command=self.add_custom_argument, bootstyle="success-outline")
         add_button.grid(row=0, column=1, sticky=E)
 
@@ -274,20 +441,20 @@ class LlamaServerGUI:
         # Other options below the list
         other_options_frame = ttk.Frame(custom_group)
         other_options_frame.grid(row=2, column=0, sticky=EW, pady=(10, 0))
-        self.verbose = tk.BooleanVar(value=False)
         verbose_cb = ttk.Checkbutton(other_options_frame, text="Verbose Logging (-v)", variable=self.verbose, bootstyle="round-toggle")
         verbose_cb.pack(side=tk.LEFT)
-        ToolTip(verbose_cb, "Enable verbose server logging for debugging.")
+        self.tooltips.register(verbose_cb, "Enable verbose server logging for debugging.")
+
+        self.rebuild_custom_args_list()
         
     def setup_output_tab(self, parent):
         """Sets up the server output log view."""
         ttk.Label(parent, text="Server Log Output:").pack(anchor=tk.W, pady=(0, 5))
-        monospace_font = ("Consolas", 10)
-        self.output_text = ScrolledText(parent, height=20, wrap=tk.WORD, font=monospace_font, autohide=True)
+        self.output_text = ScrolledText(parent, height=20, wrap=tk.NONE, undo=False, hbar=True, font=self.mono_font, autohide=True)
         self.output_text.pack(fill=tk.BOTH, expand=True)
         clear_btn = ttk.Button(parent, text="Clear Output", command=self.clear_output, bootstyle="secondary-outline")
         clear_btn.pack(pady=(10, 0), anchor=tk.E)
-        ToolTip(clear_btn, "Clear all text from the log output window.")
+        self.tooltips.register(clear_btn, "Clear all text from the log output window.")
 
     # --- UI Helper Methods ---
     def create_file_entry(self, parent, label_text, string_var, tooltip_text, file_ext, row):
@@ -295,23 +462,21 @@ class LlamaServerGUI:
         label.grid(row=row, column=0, sticky=tk.W, padx=5, pady=5)
         file_path_frame = ttk.Frame(parent)
         file_path_frame.grid(row=row, column=1, sticky=tk.EW, pady=5)
-        parent.columnconfigure(1, weight=1)
         entry = ttk.Entry(file_path_frame, textvariable=string_var)
         entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         browse_btn = ttk.Button(file_path_frame, text="Browse", command=lambda: self.browse_file(string_var, file_ext), bootstyle="primary")
         browse_btn.pack(side=tk.RIGHT)
-        ToolTip(label, text=tooltip_text)
-        ToolTip(entry, text=tooltip_text)
-        ToolTip(browse_btn, text=f"Select a {file_ext} file.")
+        self.tooltips.register(label, tooltip_text)
+        self.tooltips.register(entry, tooltip_text)
+        self.tooltips.register(browse_btn, f"Select a {file_ext} file.")
 
     def create_entry(self, parent, label_text, string_var, tooltip_text, row):
         label = ttk.Label(parent, text=label_text)
         label.grid(row=row, column=0, sticky=tk.W, padx=5, pady=5)
         entry = ttk.Entry(parent, textvariable=string_var, width=30)
         entry.grid(row=row, column=1, sticky=tk.EW, padx=5, pady=5)
-        parent.columnconfigure(1, weight=1)
-        ToolTip(label, text=tooltip_text)
-        ToolTip(entry, text=tooltip_text)
+        self.tooltips.register(label, tooltip_text)
+        self.tooltips.register(entry, tooltip_text)
     
     def create_spinbox(self, parent, label_text, variable, tooltip_text, from_, to, increment, row):
         label = ttk.Label(parent, text=label_text)
@@ -328,8 +493,8 @@ class LlamaServerGUI:
         )
         spin.grid(row=row, column=1, sticky=tk.W, padx=5, pady=5)
 
-        ToolTip(label, text=tooltip_text)
-        ToolTip(spin, text=tooltip_text)
+        self.tooltips.register(label, tooltip_text)
+        self.tooltips.register(spin, tooltip_text)
         return spin
 
     def create_combobox(self, parent, label_text, string_var, tooltip_text, values, row):
@@ -337,50 +502,70 @@ class LlamaServerGUI:
         label.grid(row=row, column=0, sticky=tk.W, padx=5, pady=5)
         combobox = ttk.Combobox(parent, textvariable=string_var, values=values)
         combobox.grid(row=row, column=1, sticky=tk.EW, padx=5, pady=5)
-        parent.columnconfigure(1, weight=1)
-        ToolTip(label, text=tooltip_text)
-        ToolTip(combobox, text=tooltip_text)
+        self.tooltips.register(label, tooltip_text)
+        self.tooltips.register(combobox, tooltip_text)
         
     def create_slider(self, parent, label_text, int_var, tooltip_text, from_, to, resolution, row):
         slider_frame = ttk.Frame(parent)
         slider_frame.grid(row=row, column=0, columnspan=2, sticky=tk.EW, padx=5, pady=5)
-        parent.columnconfigure(1, weight=1)
         label = ttk.Label(slider_frame, text=label_text)
         label.pack(anchor=tk.W)
-        ToolTip(label, text=tooltip_text)
+        self.tooltips.register(label, tooltip_text)
         control_frame = ttk.Frame(slider_frame)
         control_frame.pack(fill=tk.X, pady=(2, 0))
         slider = ttk.Scale(control_frame, from_=from_, to=to, orient=tk.HORIZONTAL,
-                           variable=int_var, command=lambda v: self.update_slider_label(int_var, value_label, resolution), bootstyle="primary")
+                           variable=int_var, command=lambda v: self._debounced_slider(int_var, value_label, resolution, v), bootstyle="primary")
         slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
-        ToolTip(slider, text=tooltip_text)
+        self.tooltips.register(slider, tooltip_text)
         value_label = ttk.Label(control_frame, text=str(int_var.get()), width=8, anchor=tk.CENTER)
         value_label.pack(side=tk.RIGHT)
         
-        slider_key = f"{label_text}_{id(int_var)}"
-        self.slider_refs[slider_key] = {'var': int_var, 'slider': slider, 'label': value_label, 'resolution': resolution}
+        self.slider_refs[str(int_var)] = {'var': int_var, 'slider': slider, 'label': value_label, 'resolution': resolution}
         self.update_slider_label(int_var, value_label, resolution)
 
     def update_slider_label(self, int_var, label, resolution):
         raw_value = int_var.get()
         rounded_value = round(raw_value / resolution) * resolution
-        int_var.set(rounded_value)
-        label.config(text=str(rounded_value))
+        if rounded_value != raw_value:
+            int_var.set(rounded_value)
+        self._set_slider_label(label, rounded_value)
+
+    def _set_slider_label(self, label, value):
+        text = str(value)
+        if label.cget('text') != text:
+            label.config(text=text)
+
+    def _debounced_slider(self, int_var, label, resolution, value):
+        """Queue the rounded value while dragging; one callback writes back the latest."""
+        raw_value = float(value)
+        rounded_value = round(raw_value / resolution) * resolution
+        self._slider_pending[str(int_var)] = (int_var, label, raw_value, rounded_value)
+        if self._slider_flush_id is None:
+            self._slider_flush_id = self.root.after(30, self._flush_slider_updates)
+
+    def _flush_slider_updates(self):
+        self._slider_flush_id = None
+        pending, self._slider_pending = self._slider_pending, {}
+        for int_var, label, raw_value, value in pending.values():
+            # The scale already stored raw_value; only rewrite it if rounding moved it
+            if raw_value != value:
+                int_var.set(value)
+            self._set_slider_label(label, value)
 
     def update_all_sliders(self):
-        for key, refs in self.slider_refs.items():
+        for refs in self.slider_refs.values():
             refs['slider'].set(refs['var'].get())
             self.update_slider_label(refs['var'], refs['label'], refs['resolution'])
 
     def create_checkbutton(self, parent, text, variable, tooltip_text, row):
         cb = ttk.Checkbutton(parent, text=text, variable=variable, bootstyle="round-toggle")
         cb.grid(row=row, column=0, columnspan=2, sticky=tk.W, padx=5, pady=5)
-        ToolTip(cb, text=tooltip_text)
+        self.tooltips.register(cb, tooltip_text)
 
     def create_button(self, parent, text, command, tooltip_text, state=tk.NORMAL, bootstyle="primary"):
         btn = ttk.Button(parent, text=text, command=command, state=state, bootstyle=bootstyle)
         btn.pack(side=tk.LEFT, padx=(0, 5))
-        ToolTip(btn, text=tooltip_text)
+        self.tooltips.register(btn, tooltip_text)
         return btn
 
     # --- Custom Argument Methods ---
@@ -388,75 +573,97 @@ class LlamaServerGUI:
         arg_text = self.new_arg_entry.get().strip()
         if not arg_text:
             return
-        if any(arg['value'] == arg_text for arg in self.custom_arguments):
+        if arg_text in self._custom_arg_values:
             Messagebox.show_warning("This argument already exists in the list.", "Duplicate Argument")
             return
             
-        self.custom_arguments.append({"value": arg_text, "enabled": True})
+        arg_item = {"value": arg_text, "enabled": True}
+        self.custom_arguments.append(arg_item)
+        self._custom_arg_values.add(arg_text)
         self.new_arg_entry.delete(0, tk.END)
-        self.rebuild_custom_args_list()
+        if self.custom_args_list_frame is not None:
+            self._build_arg_row(arg_item)
 
     def delete_custom_argument(self, arg_to_delete):
+        row_frame = self._arg_rows.pop(id(arg_to_delete), None)
+        if row_frame is not None:
+            row_frame.destroy()
         self.custom_arguments.remove(arg_to_delete)
-        self.rebuild_custom_args_list()
+        self._custom_arg_values.discard(arg_to_delete['value'])
         
     def rebuild_custom_args_list(self):
+        if self.custom_args_list_frame is None:
+            return  # Server & API tab not built yet; it builds the list itself
         for widget in self.custom_args_list_frame.winfo_children():
             widget.destroy()
+        self._arg_rows.clear()
 
         for arg_item in self.custom_arguments:
-            row_frame = ttk.Frame(self.custom_args_list_frame, padding=(5, 3))
-            row_frame.pack(fill=X, expand=True, padx=(0, 5)) 
-
-            is_enabled_var = tk.BooleanVar(value=arg_item.get("enabled", True))
-            
-            def on_toggle(item=arg_item, var=is_enabled_var):
-                item["enabled"] = var.get()
+            self._build_arg_row(arg_item)
 
-            toggle = ttk.Checkbutton(row_frame, variable=is_enabled_var, bootstyle="round-toggle", command=on_toggle)
-            toggle.pack(side=LEFT, padx=(0, 10))
+    def _build_arg_row(self, arg_item):
+        """Adds the widgets for one custom argument to the bottom of the list."""
+        row_frame = ttk.Frame(self.custom_args_list_frame, padding=(5, 3))
+        row_frame.pack(fill=X, expand=True, padx=(0, 5)) 
 
-            label = ttk.Label(row_frame, text=arg_item["value"])
-            delete_btn = ttk.Button(row_frame, text="Delete", bootstyle="danger-link", command=lambda item=arg_item: self.delete_custom_argument(item))
-            
-            # Pack order matters: label is packed after edit logic is set up.
-            delete_btn.pack(side=RIGHT, padx=(10, 0))
-            
-            ### ADDED ### Logic for double-click-to-edit
-            def start_edit(event, item, lbl, frame, del_btn):
-                lbl.pack_forget() # Hide the label
+        is_enabled_var = tk.BooleanVar(value=arg_item.get("enabled", True))
+        
+        def on_toggle(item=arg_item, var=is_enabled_var):
+            item["enabled"] = var.get()
 
-                entry_var = tk.StringVar(value=item["value"])
-                edit_entry = ttk.Entry(frame, textvariable=entry_var)
-                edit_entry.pack(side=LEFT, fill=X, expand=True, before=del_btn)
-                edit_entry.focus_set()
-                edit_entry.selection_range(0, tk.END)
+        toggle = ttk.Checkbutton(row_frame, variable=is_enabled_var, bootstyle="round-toggle", command=on_toggle)
+        toggle.pack(side=LEFT, padx=(0, 10))
 
-                def save_edit(event):
-                    new_value = entry_var.get().strip()
-                    if new_value:
-                        item["value"] = new_value
-                        lbl.config(text=new_value)
-                    
-                    edit_entry.destroy()
-                    lbl.pack(side=LEFT, fill=X, expand=True, before=del_btn) # Show the label again
+        label = ttk.Label(row_frame, text=arg_item["value"])
+        delete_btn = ttk.Button(row_frame, text="Delete", bootstyle="danger-link", command=lambda item=arg_item: self.delete_custom_argument(item))
+        
+        # Pack order matters: label is packed after edit logic is set up.
+        delete_btn.pack(side=RIGHT, padx=(10, 0))
+        
+        ### ADDED ### Logic for double-click-to-edit
+        def start_edit(event, item, lbl, frame, del_btn):
+            lbl.pack_forget() # Hide the label
+
+            entry_var = tk.StringVar(value=item["value"])
+            edit_entry = ttk.Entry(frame, textvariable=entry_var)
+            edit_entry.pack(side=LEFT, fill=X, expand=True, before=del_btn)
+            edit_entry.focus_set()
+            edit_entry.selection_range(0, tk.END)
+
+            def save_edit(event):
+                new_value = entry_var.get().strip()
+                # Ignore renames onto a value that is already in the list
+                if new_value and new_value not in self._custom_arg_values:
+                    self._custom_arg_values.discard(item["value"])
+                    self._custom_arg_values.add(new_value)
+                    item["value"] = new_value
+                    lbl.config(text=new_value)
+                
+                edit_entry.destroy()
+                lbl.pack(side=LEFT, fill=X, expand=True, before=del_btn) # Show the label again
 
-                edit_entry.bind("<Return>", save_edit)
-                edit_entry.bind("<FocusOut>", save_edit)
+            edit_entry.bind("<Return>", save_edit)
+            edit_entry.bind("<FocusOut>", save_edit)
 
-            label.bind("<Double-1>", lambda e, item=arg_item, lbl=label, frame=row_frame, btn=delete_btn: start_edit(e, item, lbl, frame, btn))
-            ToolTip(label, "Double-click to edit this argument.")
-            label.pack(side=LEFT, fill=X, expand=True, anchor=W)
+        label.bind("<Double-1>", lambda e, item=arg_item, lbl=label, frame=row_frame, btn=delete_btn: start_edit(e, item, lbl, frame, btn))
+        self.tooltips.register(label, "Double-click to edit this argument.")
+        label.pack(side=LEFT, fill=X, expand=True, anchor=W)
+        self._arg_rows[id(arg_item)] = row_frame
 
 
     # --- Core Functionality ---
     def browse_file(self, string_var, file_ext):
+        from tkinter import filedialog
+        initialdir = (self._last_dirs.get(file_ext)
+                      or os.path.dirname(string_var.get())
+                      or os.path.expanduser('~'))
         filename = filedialog.askopenfilename(
-            title=f"Select {file_ext} File",
+            title=f"Select {file_ext} File", initialdir=initialdir,
             filetypes=[(f"{file_ext.upper()} files", f"*{file_ext}"), ("All files", "*.*")]
         )
         if filename:
             string_var.set(filename)
+            self._last_dirs[file_ext] = os.path.dirname(filename)
 
     def generate_command(self):
         if not self.model_path.get().strip():
@@ -467,38 +674,24 @@ class LlamaServerGUI:
         cmd.extend(['-c', str(self.ctx_size.get())])
         cmd.extend(['-ngl', str(self.gpu_layers.get())])
         
-        args = {
-            '--host': self.host, '--port': self.port, '-a': self.alias,
-            '--api-key': self.api_key, '-t': self.threads, '-b': self.batch_size, 
-            '-np': self.parallel, '--lora': self.lora_path,
-            '--mmproj': self.mmproj_path, '--chat-template': self.chat_template,
-            '-md': self.draft_model_path, '-ngld': self.draft_gpu_layers,
-            '--draft': self.draft_tokens, '--n-cpu-moe': self.moe_cpu_layers,
-            '--reasoning-format': self.reasoning_format, '-ub': self.ubatch_size,
-            '-n': self.n_predict, '--temp': self.temp, '--top-k': self.top_k,
-            '--top-p': self.top_p, '--repeat-penalty': self.repeat_penalty
-        }
-        for flag, var in args.items():
-            if var.get().strip():
-                cmd.extend([flag, var.get().strip()])
+        for flag, name in self._STR_ARGS:
+            value = getattr(self, name).get().strip()
+            if value:
+                cmd.extend([flag, value])
         
-        if self.reasoning_effort.get().strip():
-            kwargs_json = json.dumps({"reasoning_effort": self.reasoning_effort.get()})
+        reasoning_effort = self.reasoning_effort.get()
+        if reasoning_effort.strip():
+            kwargs_json = self._REASONING_KWARGS.get(reasoning_effort)
+            if kwargs_json is None:  # typed-in level
+                kwargs_json = json.dumps({"reasoning_effort": reasoning_effort})
             cmd.extend(['--chat-template-kwargs', kwargs_json])
         
         # Handle flash attention as a special case since it needs a value
         if self.flash_attn.get().strip() and self.flash_attn.get().strip() != "auto":
             cmd.extend(['-fa', self.flash_attn.get().strip()])
         
-        bool_args = {
-            '--no-mmap': self.no_mmap,
-            '--no-webui': self.no_webui, '-cb': self.cont_batching,
-            '--mlock': self.mlock, '--embedding': self.embedding,
-            '--jinja': self.jinja, '-v': self.verbose,
-            '--ignore-eos': self.ignore_eos
-        }
-        for flag, var in bool_args.items():
-            if var.get():
+        for flag, name in self._BOOL_ARGS:
+            if getattr(self, name).get():
                 cmd.append(flag)
 
         if self.numa.get():
@@ -511,10 +704,30 @@ class LlamaServerGUI:
             
         return cmd
 
-    def show_command(self):
+    def _fmt_cmd(self, cmd):
+        """Render a command list as a line that can be pasted into the platform's shell."""
+        if os.name == 'nt':
+            import subprocess
+            return subprocess.list2cmdline(cmd)
+        import shlex
+        return shlex.join(cmd)
+
+    def _compute_cmd(self):
+        """Return the command and its display string, reusing them while no setting changed."""
+        sig = (tuple(getattr(self, name).get() for name, _cls, _default in self._FIELDS),
+               tuple((arg.get("value", ""), arg.get("enabled", False)) for arg in self.custom_arguments))
+        if self._cmd_cache is not None and self._cmd_cache[0] == sig:
+            return self._cmd_cache[1], self._cmd_cache[2]
         cmd = self.generate_command()
+        if not cmd:
+            return None, None
+        command_str = self._fmt_cmd(cmd)
+        self._cmd_cache = (sig, cmd, command_str)
+        return cmd, command_str
+
+    def show_command(self):
+        cmd, command_str = self._compute_cmd()
         if not cmd: return
-        command_str = " ".join(f'"{arg}"' if " " in arg else arg for arg in cmd)
         cmd_window = ttk.Toplevel(self.root)
         cmd_window.title("Generated Command")
         cmd_window.geometry("1200x300")
@@ -532,13 +745,21 @@ class LlamaServerGUI:
 
     def start_server(self):
         if self.is_running: return
-        cmd = self.generate_command()
+        cmd, command_str = self._compute_cmd()
         if not cmd: return
             
+        self.build_tab(self.output_frame)
         self.output_text.delete(1.0, tk.END)
-        command_str = " ".join(f'"{arg}"' if " " in arg else arg for arg in cmd)
         self.update_output(f"▶ Starting server with command:\n{command_str}\n\n" + "="*80 + "\n")
         
+        # Each run gets its own event so a reader left over from a previous
+        # run can never be revived by the next start.
+        stop_evt = self._stop_evt = threading.Event()
+
+        # Only needed once a server is actually launched
+        import selectors
+        import subprocess
+
         def run_server():
             try:
                 startupinfo = None
@@ -546,36 +767,70 @@ class LlamaServerGUI:
                     startupinfo = subprocess.STARTUPINFO()
                     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-                self.server_process = subprocess.Popen(
+                process = self.server_process = subprocess.Popen(
                     cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                    universal_newlines=False, bufsize=1, startupinfo=startupinfo
+                    bufsize=0, startupinfo=startupinfo
                 )
                 
-                for line_bytes in iter(self.server_process.stdout.readline, b''):
-                    try:
-                        line = line_bytes.decode('utf-8')
-                    except UnicodeDecodeError:
-                        line = line_bytes.decode('latin-1', errors='replace')
-                    self.root.after(0, self.update_output, line)
-                self.server_process.wait()
-                self.root.after(0, self.server_stopped)
+                # Read the unbuffered pipe in large blocks; the incremental decoder keeps
+                # multi-byte characters that straddle two reads intact. Reading goes on
+                # to EOF so the server's shutdown output is kept. Where pipes can be
+                # polled, a stop request also starts a deadline, after which a server
+                # that keeps the pipe open is no longer waited for; Windows pipes
+                # can't be selected, so there the read blocks until the terminated
+                # server closes its end.
+                fd = process.stdout.fileno()
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                sel = None
+                if os.name != 'nt':
+                    sel = selectors.DefaultSelector()
+                    sel.register(process.stdout, selectors.EVENT_READ)
+                deadline = None
+                try:
+                    while True:
+                        if deadline is None:
+                            if stop_evt.is_set():
+                                deadline = time.monotonic() + self.STOP_DRAIN_SECONDS
+                        elif time.monotonic() > deadline:
+                            break
+                        if sel is not None and not sel.select(timeout=0.25):
+                            continue
+                        buf = os.read(fd, 65536)
+                        if not buf:
+                            break
+                        text = decoder.decode(buf)
+                        if text:
+                            self._out_queue.append(text)
+                finally:
+                    if sel is not None:
+                        sel.close()
+                text = decoder.decode(b'', final=True)
+                if text:
+                    self._out_queue.append(text)
+                # Close our end first so a server still writing can't block on
+                # a full pipe while we wait for it to exit
+                process.stdout.close()
+                process.wait()
                 
+            # This thread never touches Tk: errors go through the queue too, and
+            # _flush_output notices the thread has ended and calls server_stopped.
             except FileNotFoundError:
-                self.root.after(0, self.update_output, f"\n⚠ Error: 'llama-server' executable not found. Ensure it's in the PATH or same directory.\n")
-                self.root.after(0, self.server_stopped)
+                self._out_queue.append(f"\n⚠ Error: 'llama-server' executable not found. Ensure it's in the PATH or same directory.\n")
             except Exception as e:
-                self.root.after(0, self.update_output, f"\n⚠ Error starting server: {e}\n")
-                self.root.after(0, self.server_stopped)
+                self._out_queue.append(f"\n⚠ Error starting server: {e}\n")
         
-        threading.Thread(target=run_server, daemon=True).start()
+        self._reader = threading.Thread(target=run_server, daemon=True)
+        self._reader.start()
         
         self.is_running = True
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.browser_button.config(state=tk.NORMAL)
+        self.root.after(self.OUTPUT_POLL_MS, self._flush_output)
 
     def stop_server(self):
         if self.server_process and self.is_running:
+            self._stop_evt.set()
             try:
                 self.server_process.terminate()
                 self.update_output("\n" + "="*80 + "\n⏹️ Server stop requested...\n")
@@ -583,6 +838,7 @@ class LlamaServerGUI:
                 self.update_output(f"\n⚠ Error stopping server: {e}\n")
 
     def server_stopped(self):
+        self._drain_output()
         self.is_running = False
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
@@ -590,92 +846,122 @@ class LlamaServerGUI:
         self.update_output("⏹️ Server process has terminated.\n")
 
     def update_output(self, text):
+        # Only follow the tail if the user hasn't scrolled up to read history
+        at_bottom = self.output_text.text.yview()[1] > 0.999
         self.output_text.insert(tk.END, text)
-        self.output_text.see(tk.END)
+        if at_bottom:
+            self.output_text.see(tk.END)
+        # Each insert can be a whole batch, so count the lines it added
+        self._lines_since_trim += text.count('\n')
+        if self._lines_since_trim < self.LOG_TRIM_SLACK:
+            return
+        self._lines_since_trim = 0
+        end_line = int(self.output_text.index('end-1c').split('.')[0])
+        if end_line > self.MAX_LOG_LINES:
+            self.output_text.delete('1.0', f'{end_line - self.MAX_LOG_LINES}.0')
+
+    def _drain_output(self):
+        """Write all queued server output to the log in a single insert."""
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._out_queue.popleft())
+            except IndexError:
+                break
+        if chunks:
+            self.update_output("".join(chunks))
+        return bool(chunks)
+
+    def _flush_output(self):
+        """Periodically drain queued server output until the reader thread ends."""
+        if self.is_in_tray:
+            # Nobody is watching the log; hold output back without touching Tk
+            # and write it in one go once the window is shown again.
+            self._compact_hidden_output()
+        elif self._drain_output():
+            # Redraw the batch now; idle tasks only, never a full update()
+            self.output_text.update_idletasks()
+        if self._reader.is_alive():
+            self.root.after(self.OUTPUT_POLL_MS, self._flush_output)
+        else:
+            self.server_stopped()
+
+    def _compact_hidden_output(self):
+        """Bound output queued while hidden to the lines the log view would keep."""
+        if len(self._out_queue) < self.HIDDEN_QUEUE_CHUNKS:
+            return
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._out_queue.popleft())
+            except IndexError:
+                break
+        lines = "".join(chunks).splitlines(keepends=True)
+        # Anything the reader appended meanwhile stays after the kept tail
+        self._out_queue.appendleft("".join(lines[-self.MAX_LOG_LINES:]))
 
     def clear_output(self):
         self.output_text.delete(1.0, tk.END)
 
     def save_config(self):
-        config = {
-            'model_path': self.model_path.get(), 'alias': self.alias.get(),
-            'lora_path': self.lora_path.get(), 'mmproj_path': self.mmproj_path.get(),
-            'chat_template': self.chat_template.get(), 'reasoning_effort': self.reasoning_effort.get(),
-            'jinja': self.jinja.get(), 'ctx_size': self.ctx_size.get(),
-            'gpu_layers': self.gpu_layers.get(), 'threads': self.threads.get(),
-            'batch_size': self.batch_size.get(), 'cont_batching': self.cont_batching.get(),
-            'parallel': self.parallel.get(), 'flash_attn': self.flash_attn.get(),
-            'mlock': self.mlock.get(), 'no_mmap': self.no_mmap.get(), 'numa': self.numa.get(),
-            'moe_cpu_layers': self.moe_cpu_layers.get(), 'draft_model_path': self.draft_model_path.get(),
-            'draft_gpu_layers': self.draft_gpu_layers.get(), 'draft_tokens': self.draft_tokens.get(),
-            'host': self.host.get(), 'port': self.port.get(), 'api_key': self.api_key.get(),
-            'no_webui': self.no_webui.get(), 'embedding': self.embedding.get(),
-            'verbose': self.verbose.get(), 'custom_arguments_list': self.custom_arguments,
-            'reasoning_format': self.reasoning_format.get(), 'ubatch_size': self.ubatch_size.get(),
-            'n_predict': self.n_predict.get(), 'ignore_eos': self.ignore_eos.get(),
-            'temp': self.temp.get(), 'top_k': self.top_k.get(), 'top_p': self.top_p.get(),
-            'repeat_penalty': self.repeat_penalty.get()
-        }
+        config = {name: getattr(self, name).get() for name, _cls, _default in self._FIELDS}
+        config['custom_arguments_list'] = [dict(arg) for arg in self.custom_arguments]
+        config['last_dirs'] = dict(self._last_dirs)
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=4)
+            if config != self._cached_config or self._config_stat() != self._cached_stat:
+                data = _dumps_config(config)
+                # Write next to the config and swap it in, so an interrupted
+                # save never leaves a truncated file behind
+                tmp_path = self.config_file + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.config_file)
+                self._cached_config = config
+                self._cached_stat = self._config_stat()
             Messagebox.ok(f"Configuration saved to {self.config_file}", "Success")
         except Exception as e:
             Messagebox.show_error(f"Failed to save configuration: {e}", "Error")
 
-    def load_config(self):
-        if not os.path.exists(self.config_file): return
+    def _config_stat(self):
         try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load_config(self, force=False):
+        """Apply the saved settings; the file is only re-parsed if it changed or force is set."""
+        stat = self._config_stat()
+        if stat is None: return
+        try:
+            if not force and stat == self._cached_stat and self._cached_config is not None:
+                config = self._cached_config
+            else:
+                with open(self.config_file, 'rb') as f:
+                    data = f.read()
+                config = _loads_config(data)
+                self._cached_config = config
+                self._cached_stat = stat
             
-            # Load values, providing defaults for missing keys
-            self.model_path.set(config.get('model_path', ''))
-            self.alias.set(config.get('alias', ''))
-            self.lora_path.set(config.get('lora_path', ''))
-            self.mmproj_path.set(config.get('mmproj_path', ''))
-            self.chat_template.set(config.get('chat_template', ''))
-            self.reasoning_effort.set(config.get('reasoning_effort', ''))
-            self.jinja.set(config.get('jinja', False))
-            self.ctx_size.set(config.get('ctx_size', 4096))
-            self.gpu_layers.set(config.get('gpu_layers', 99))
-            self.threads.set(config.get('threads', ''))
-            self.batch_size.set(config.get('batch_size', ''))
-            self.cont_batching.set(config.get('cont_batching', False))
-            self.parallel.set(config.get('parallel', ''))
-            self.flash_attn.set(config.get('flash_attn', False))
-            self.mlock.set(config.get('mlock', False))
-            self.no_mmap.set(config.get('no_mmap', False))
-            self.numa.set(config.get('numa', False))
-            self.moe_cpu_layers.set(config.get('moe_cpu_layers', ''))
-            self.draft_model_path.set(config.get('draft_model_path', ''))
-            self.draft_gpu_layers.set(config.get('draft_gpu_layers', ''))
-            self.draft_tokens.set(config.get('draft_tokens', ''))
-            self.host.set(config.get('host', '127.0.0.1'))
-            self.port.set(config.get('port', '8080'))
-            self.api_key.set(config.get('api_key', ''))
-            self.no_webui.set(config.get('no_webui', False))
-            self.embedding.set(config.get('embedding', False))
-            self.verbose.set(config.get('verbose', False))
+            # Load values, providing defaults for missing keys. Only changed values
+            # are set, since every set() fires the variable's traces.
+            for name, _cls, default in self._FIELDS:
+                var = getattr(self, name)
+                value = config.get(name, default)
+                if var.get() != value:
+                    var.set(value)
+            self._last_dirs = dict(config.get('last_dirs', {}))
 
             # Load new custom arguments list
-            self.custom_arguments = config.get('custom_arguments_list', [])
+            self.custom_arguments = [dict(arg) for arg in config.get('custom_arguments_list', [])]
             # Backward compatibility for old 'custom_args' string
             if not self.custom_arguments and 'custom_args' in config:
                 old_args_str = config['custom_args'].strip()
                 if old_args_str:
                     self.custom_arguments.append({"value": old_args_str, "enabled": True})
+            self._custom_arg_values = {arg['value'] for arg in self.custom_arguments}
             self.rebuild_custom_args_list()
 
-            self.reasoning_format.set(config.get('reasoning_format', ''))
-            self.ubatch_size.set(config.get('ubatch_size', ''))
-            self.n_predict.set(config.get('n_predict', ''))
-            self.ignore_eos.set(config.get('ignore_eos', False))
-            self.temp.set(config.get('temp', ''))
-            self.top_k.set(config.get('top_k', ''))
-            self.top_p.set(config.get('top_p', ''))
-            self.repeat_penalty.set(config.get('repeat_penalty', ''))
-            
             self.update_all_sliders()
         except Exception as e:
             Messagebox.show_error(f"Failed to load configuration: {e}", "Error")
@@ -685,6 +971,7 @@ class LlamaServerGUI:
         if host == '0.0.0.0': host = 'localhost'
         url = f"http://{host}:{self.port.get().strip()}"
         try:
+            import webbrowser
             webbrowser.open(url)
             self.update_output(f"🌐 Opened browser at {url}\n")
         except Exception as e:
@@ -707,14 +994,22 @@ class LlamaServerGUI:
         return icon
 
     def load_app_icon(self):
-        """Load app icon for tray (fallback to blank)."""
+        """Load app icon for tray (fallback to blank), decoding it only once."""
+        if self._tray_image is not None:
+            return self._tray_image
         try:
-            return Image.open(resource_path("llama-cpp.ico"))
+            image = Image.open(resource_path("llama-cpp.ico"))
+            image.load()
         except Exception:
-            return Image.new("RGB", (64, 64), color=(0, 0, 0))
+            image = Image.new("RGB", (64, 64), color=(0, 0, 0))
+        self._tray_image = image
+        return image
 
     def show_window(self, icon=None, item=None):
         """Restore window from tray."""
+        if self.tray_icon is not None:
+            self.tray_icon.visible = False
+        self.is_in_tray = False
         self.root.after(0, self.root.deiconify)
 
     def open_browser_from_tray(self, icon=None, item=None):
@@ -733,18 +1028,25 @@ class LlamaServerGUI:
         """Hide window and show tray icon."""
         self.root.withdraw()
         if self.tray_icon is None:
+            # Created and run once; run()'s default setup makes it visible.
+            # Later trips to the tray just show the same icon again.
             self.tray_icon = self.create_tray_icon()
             threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        else:
+            self.tray_icon.visible = True
+        self.is_in_tray = True
 
             
+# Directory bundled resources are looked up in, resolved once at import
+_RES_BASE = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.abspath(".")
+
 def resource_path(filename):
     """Get absolute path to resource, works for dev and for PyInstaller bundle"""
-    if getattr(sys, 'frozen', False):
-        return os.path.join(sys._MEIPASS, filename)
-    return os.path.join(os.path.abspath("."), filename)
+    return os.path.join(_RES_BASE, filename)
 
 def main():
     root = ttk.Window(themename="cosmo")
+    root.withdraw()
     
     try:
         icon_path = resource_path("llama-cpp.ico")